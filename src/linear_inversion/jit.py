@@ -0,0 +1,30 @@
+# Copyright 2025 Natsunoyuki.
+#
+# linear_inversion is free software: you can redistribute it and/or modify it 
+# under the terms of the GNU General Public License as published by the Free 
+# Software Foundation, either version 3 of the License, or (at your option) any 
+# later version.
+#
+# linear_inversion is distributed in the hope that it will be useful, but 
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or 
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more 
+# details.
+#
+# You should have received a copy of the GNU General Public License along with 
+# linear_inversion. If not, see <https://www.gnu.org/licenses/>.
+
+# Numba is an optional dependency used to JIT compile the SGD solvers. If it
+# is not installed, the solvers fall back to their NumPy implementations.
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    njit = None
+    prange = range
+    NUMBA_AVAILABLE = False
+
+
+# Minimum number of data kernel elements N * M above which the multi-threaded
+# SGD kernels are used. Below this the thread start up cost outweighs the
+# parallel matrix vector products.
+PARALLEL_THRESHOLD = 10_000
@@ -14,9 +14,11 @@
 # linear_inversion. If not, see <https://www.gnu.org/licenses/>.
 
 import numpy as np
+from scipy.linalg.blas import dgemv
 from scipy.optimize import linprog
+from scipy.sparse import coo_matrix
 
-from linear_inversion.least_squares import least_squares
+from linear_inversion.jit import njit, prange, NUMBA_AVAILABLE, PARALLEL_THRESHOLD
 
 
 def l1_norm_inversion(G: np.ndarray, d: np.ndarray, sd = None) -> np.ndarray:
@@ -54,35 +56,38 @@ def l1_norm_inversion(G: np.ndarray, d: np.ndarray, sd = None) -> np.ndarray:
     f[2*M:2*M+N] = 1.0 / sd
 
     # Make Aeq and beq for the equality constraints:
-    Aeq = np.zeros([2*N, L])
-    beq = np.zeros(2*N)
-    
-    Aeq[:N, :M] = G
-    Aeq[:N, M:2*M] = -G
-    Aeq[:N, 2*M:2*M+N] = -np.eye(N)
-    Aeq[:N, 2*M+N:2*M+2*N] = np.eye(N)
-    beq[:N] = d
-    
-    Aeq[N:2*N, :M] = G
-    Aeq[N:2*N, M:2*M] = -G
-    Aeq[N:2*N, 2*M:2*M+N] = np.eye(N)
-    Aeq[N:2*N, 2*M+2*N:2*M+3*N] = -np.eye(N)
-    beq[N:2*N] = d
-    
-    # Make A and b for the >=0 constraints:
-    A = np.zeros([L+2*M, L])
-    b = np.zeros(L+2*M)
-    A[:L, :] = -np.eye(L)
-    b[:L] = np.zeros(L)
-    
-    A[L:L+2*M] = np.eye(2*M, L)
-    # For this example, we use the least squares solution
-    # as the upper bound for the model parameters.
-    mls = least_squares(G, d)
-    mupperbound = 10 * np.max(np.abs(mls))
-    b[L:L+2*M] = mupperbound
+    # Aeq = [[G, -G, -I,  I,  0],
+    #        [G, -G,  I,  0, -I]]
+    # Aeq is mostly identity and zero blocks, so it is built as a sparse
+    # matrix, which HiGHS accepts directly. The non-zero entries are placed
+    # with index arrays rather than by assembling separate identity blocks.
+    GG = np.hstack([G, -G]).ravel()
+    g_rows = np.repeat(np.arange(N), 2*M)
+    g_cols = np.tile(np.arange(2*M), N)
+
+    idx = np.arange(N)
+    ones = np.ones(N)
+    i_rows = np.concatenate([idx, idx, N+idx, N+idx])
+    i_cols = 2*M + np.concatenate([idx, N+idx, idx, 2*N+idx])
+    i_vals = np.concatenate([-ones, ones, ones, -ones])
+
+    Aeq = coo_matrix(
+        (
+            np.concatenate([GG, GG, i_vals]), 
+            (
+                np.concatenate([g_rows, N+g_rows, i_rows]), 
+                np.concatenate([g_cols, g_cols, i_cols]),
+            ),
+        ),
+        shape=(2*N, L),
+    ).tocsr()
+    beq = np.concatenate([d, d])
     
-    res = linprog(f, A, b, Aeq, beq)
+    # All the LP variables [m1, m2, alpha, x1, x2] are >=0. These are passed
+    # to HiGHS as variable bounds instead of as inequality constraints.
+    res = linprog(
+        f, A_eq=Aeq, b_eq=beq, bounds=(0, None), method="highs",
+    )
     
     # The output res = [m1, m2, alpha, x1, x2]. Extract m1 and m2
     # and calculate the model parameters using m = m1 - m2.
@@ -116,17 +121,85 @@ def l1_norm_inversion_sgd(
         m: ndarray
             Linear inversion model parameters.
     """
-    m = np.random.normal(size = G.shape[1])
-    losses = []
+    N, M = G.shape
+    m = np.random.normal(size = M)
+    # The losses are only recorded if they are returned. The JIT kernels
+    # receive an empty array instead.
+    losses = np.empty(n_iter if return_loss is True else 0)
+
+    if NUMBA_AVAILABLE:
+        G = np.ascontiguousarray(G, dtype=np.float64)
+        d = np.ascontiguousarray(d, dtype=np.float64)
+        if N * M > PARALLEL_THRESHOLD:
+            m = _l1_sgd_par(G, d, float(eta), int(n_iter), m, losses)
+        else:
+            m = _l1_sgd(G, d, float(eta), int(n_iter), m, losses)
+    else:
+        # Fortran ordered G and preallocated buffers let both matrix vector 
+        # products run as in-place BLAS gemv calls without temporaries.
+        G = np.asfortranarray(G, dtype=np.float64)
+        d_pred = np.empty(N)
+        loss = np.empty(N)
+        grad = np.empty(M)
 
-    for i in range(n_iter):
-        d_pred = np.dot(G, m)
-        loss = d - d_pred
-        # m = m + eta * 2.0 * np.dot(G.T, loss) / G.shape[0]
-        m = m + eta * np.dot(G.T, np.abs(d - d_pred) / (d - d_pred)) / G.shape[0]
-        losses.append(np.mean(np.abs(loss)))
+        for i in range(n_iter):
+            d_pred = dgemv(1.0, G, m, 0.0, d_pred, overwrite_y=1)
+            np.subtract(d, d_pred, out=loss)
+            if return_loss is True:
+                losses[i] = np.mean(np.abs(loss))
+            # The gradient of the L1 loss is the sign of the residuals.
+            np.sign(loss, out=loss)
+            grad = dgemv(eta / N, G, loss, 0.0, grad, trans=1, overwrite_y=1)
+            m += grad
 
     if return_loss is True:
         return m, losses
     else:
         return m
+
+
+if NUMBA_AVAILABLE:
+    @njit(fastmath=True, cache=True)
+    def _l1_sgd(G, d, eta, n_iter, m, losses):
+        """
+        JIT compiled L1 norm SGD loop. Updates m in place and writes the mean
+        absolute error of each iteration to losses if it is not empty.
+        """
+        N = G.shape[0]
+        record = losses.shape[0] > 0
+        for i in range(n_iter):
+            loss = d - G @ m
+            if record:
+                losses[i] = np.mean(np.abs(loss))
+            m += (eta / N) * (G.T @ np.sign(loss))
+        return m
+
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _l1_sgd_par(G, d, eta, n_iter, m, losses):
+        """
+        Multi-threaded variant of _l1_sgd for large data kernels. The matrix 
+        vector products are parallelized over the rows of G, and the 
+        transposed product over the columns of G so that each thread owns 
+        its own elements of m.
+        """
+        N, M = G.shape
+        loss = np.empty(N)
+        record = losses.shape[0] > 0
+        for k in range(n_iter):
+            for i in prange(N):
+                s = 0.0
+                for j in range(M):
+                    s += G[i, j] * m[j]
+                loss[i] = d[i] - s
+            if record:
+                losses[k] = np.mean(np.abs(loss))
+            # The gradient of the L1 loss is the sign of the residuals.
+            for i in prange(N):
+                loss[i] = np.sign(loss[i])
+            for j in prange(M):
+                s = 0.0
+                for i in range(N):
+                    s += G[i, j] * loss[i]
+                m[j] += (eta / N) * s
+        return m
@@ -13,10 +13,26 @@
 # You should have received a copy of the GNU General Public License along with 
 # linear_inversion. If not, see <https://www.gnu.org/licenses/>.
 
+from functools import lru_cache
+
 import numpy as np
+from scipy.linalg import LinAlgError, lstsq
+from scipy.linalg.blas import dgemv
+from scipy.linalg.lapack import get_lapack_funcs, _compute_lwork
+
+from linear_inversion.jit import njit, prange, NUMBA_AVAILABLE, PARALLEL_THRESHOLD
+
 
+# The analytical solvers skip the NaN/inf input checks of scipy.linalg by
+# default. Set to True to validate G and d before each solve.
+_SAFE = False
 
-def least_squares(G: np.ndarray, d: np.ndarray) -> np.ndarray:
+
+def least_squares(
+    G: np.ndarray, 
+    d: np.ndarray, 
+    lapack_driver: str = "gelsd",
+) -> np.ndarray:
     """
     Analytical linear least squares linear inversion.
 
@@ -25,12 +41,85 @@ def least_squares(G: np.ndarray, d: np.ndarray) -> np.ndarray:
             Input data/data kernel/Green function. Must be a vander matrix.
         d: ndarray
             Measured variable/target variable.
+        lapack_driver: str
+            LAPACK driver used by scipy.linalg.lstsq. "gelsd" (SVD based) by
+            default. "gelsy" (pivoted QR based) is faster for well conditioned
+            G such as low order vander matrices.
+    Outputs
+        m: ndarray
+            Linear inversion model parameters.
+    """
+    m = lstsq(G, d, lapack_driver=lapack_driver, check_finite=_SAFE)[0]
+    return m
+
+
+@lru_cache(maxsize=32)
+def _gesdd_lwork(shape: tuple, dtype: np.dtype) -> int:
+    """
+    Optimal LAPACK gesdd workspace size for a reduced SVD of a matrix with the
+    given shape and dtype. Cached so that repeated inversions of like shaped
+    data kernels skip the workspace query.
+    """
+    gesdd_lwork, = get_lapack_funcs(("gesdd_lwork",), dtype=dtype)
+    return _compute_lwork(
+        gesdd_lwork, *shape, compute_uv=1, full_matrices=0,
+    )
+
+
+def svd_factor(G: np.ndarray) -> tuple:
+    """
+    Reduced singular value decomposition of G using LAPACK gesdd. The
+    decomposition only depends on G, and can be reused with
+    least_squares_svd() for any number of measurements d.
+
+    Inputs
+        G: ndarray
+            Input data/data kernel/Green function. Must be a vander matrix.
+    Outputs
+        factor: tuple
+            (U, S, Vh) with G = U @ np.diag(S) @ Vh and S in descending order.
+    """
+    if _SAFE:
+        G = np.asarray_chkfinite(G)
+    gesdd, = get_lapack_funcs(("gesdd",), (G,))
+    lwork = _gesdd_lwork(G.shape, G.dtype)
+    U, S, Vh, info = gesdd(
+        G, lwork=lwork, compute_uv=1, full_matrices=0, overwrite_a=0,
+    )
+    if info > 0:
+        raise LinAlgError("SVD did not converge.")
+    if info < 0:
+        raise ValueError(f"Illegal value in argument {-info} of gesdd.")
+    return U, S, Vh
+
+
+def least_squares_svd(factor: tuple, d: np.ndarray) -> np.ndarray:
+    """
+    Analytical linear least squares linear inversion using a precomputed
+    reduced SVD of G. Singular values below machine epsilon relative to the
+    largest one are treated as zero, as in scipy.linalg.lstsq, so the solution
+    matches least_squares() and rank deficient G does not raise.
+
+    Inputs
+        factor: tuple
+            Reduced SVD (U, S, Vh) from svd_factor(G).
+        d: ndarray
+            Measured variable/target variable.
     Outputs
         m: ndarray
             Linear inversion model parameters.
     """
-    m = np.dot(np.linalg.inv(np.dot(G.T, G)), G.T)
-    m = np.dot(m, d)
+    if _SAFE:
+        d = np.asarray_chkfinite(d)
+    U, S, Vh = factor
+    S_inv = np.zeros_like(S)
+    keep = S > np.finfo(S.dtype).eps * S[0]
+    S_inv[keep] = 1.0 / S[keep]
+
+    c = U.T @ d
+    # Column vector d is scaled row-wise as well.
+    c *= S_inv.reshape((-1,) + (1,) * (c.ndim - 1))
+    m = Vh.T @ c
     return m
 
 
@@ -50,16 +139,18 @@ def svd_inversion(G: np.ndarray, d: np.ndarray, tol: float = 0.01) -> np.ndarray
         m: ndarray
             Linear inversion model parameters.
     """
-    U, S, Vh = np.linalg.svd(G, full_matrices=True)
+    if _SAFE:
+        d = np.asarray_chkfinite(d)
+    U, S, Vh = svd_factor(G)
+    if S[0] == 0:
+        raise LinAlgError("G has no non-zero singular values.")
     
-    Sp = S[S >= np.max(S) * tol]
-    p = len(Sp)
-    Up = U[:, :p]
-    Vhp = Vh[:p, :]
-
-    Lp = np.diag(Sp)
-    G_inv = np.dot(Vhp.T, np.dot(np.linalg.inv(Lp), Up.T))
-    m = np.dot(G_inv, d)
+    # The singular values are sorted in descending order, so the retained
+    # values are the leading p entries of S.
+    p = int(np.sum(S >= S[0] * tol))
+
+    # m = Vp Lp^-1 Up^T d, with Lp^-1 applied as a broadcast scaling.
+    m = (Vh[:p].T * (1.0 / S[:p])) @ (U[:, :p].T @ d)
     return m
 
 
@@ -89,16 +180,82 @@ def least_squares_sgd(
         m: array
             Linear inversion model parameters.
     """
-    m = np.random.normal(size = G.shape[1])
-    losses = []
+    N, M = G.shape
+    m = np.random.normal(size = M)
+    # The losses are only recorded if they are returned. The JIT kernels
+    # receive an empty array instead.
+    losses = np.empty(n_iter if return_loss is True else 0)
 
-    for i in range(n_iter):
-        d_pred = np.dot(G, m)
-        loss = d - d_pred
-        m = m + eta * 2.0 * np.dot(G.T, loss) / G.shape[0]
-        losses.append(np.mean(loss ** 2))
+    if NUMBA_AVAILABLE:
+        G = np.ascontiguousarray(G, dtype=np.float64)
+        d = np.ascontiguousarray(d, dtype=np.float64)
+        if N * M > PARALLEL_THRESHOLD:
+            m = _l2_sgd_par(G, d, float(eta), int(n_iter), m, losses)
+        else:
+            m = _l2_sgd(G, d, float(eta), int(n_iter), m, losses)
+    else:
+        # Fortran ordered G and preallocated buffers let both matrix vector 
+        # products run as in-place BLAS gemv calls without temporaries.
+        G = np.asfortranarray(G, dtype=np.float64)
+        d_pred = np.empty(N)
+        loss = np.empty(N)
+        grad = np.empty(M)
+
+        for i in range(n_iter):
+            d_pred = dgemv(1.0, G, m, 0.0, d_pred, overwrite_y=1)
+            np.subtract(d, d_pred, out=loss)
+            grad = dgemv(
+                2.0 * eta / N, G, loss, 0.0, grad, trans=1, overwrite_y=1,
+            )
+            m += grad
+            if return_loss is True:
+                losses[i] = loss @ loss / N
 
     if return_loss is True:
         return m, losses
     else:
         return m
+
+
+if NUMBA_AVAILABLE:
+    @njit(fastmath=True, cache=True)
+    def _l2_sgd(G, d, eta, n_iter, m, losses):
+        """
+        JIT compiled least squares SGD loop. Updates m in place and writes the
+        mean squared error of each iteration to losses if it is not empty.
+        """
+        N = G.shape[0]
+        record = losses.shape[0] > 0
+        for i in range(n_iter):
+            loss = d - G @ m
+            m += (2.0 * eta / N) * (G.T @ loss)
+            if record:
+                losses[i] = loss @ loss / N
+        return m
+
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _l2_sgd_par(G, d, eta, n_iter, m, losses):
+        """
+        Multi-threaded variant of _l2_sgd for large data kernels. The matrix 
+        vector products are parallelized over the rows of G, and the 
+        transposed product over the columns of G so that each thread owns 
+        its own elements of m.
+        """
+        N, M = G.shape
+        loss = np.empty(N)
+        record = losses.shape[0] > 0
+        for k in range(n_iter):
+            for i in prange(N):
+                s = 0.0
+                for j in range(M):
+                    s += G[i, j] * m[j]
+                loss[i] = d[i] - s
+            if record:
+                losses[k] = loss @ loss / N
+            for j in prange(M):
+                s = 0.0
+                for i in range(N):
+                    s += G[i, j] * loss[i]
+                m[j] += (2.0 * eta / N) * s
+        return m
@@ -14,12 +14,98 @@
 # linear_inversion. If not, see <https://www.gnu.org/licenses/>.
 
 import numpy as np
+from numpy.polynomial.polynomial import polyvander
 
-from linear_inversion.least_squares import least_squares, least_squares_sgd
+from linear_inversion.jit import njit, NUMBA_AVAILABLE
+from linear_inversion.least_squares import (
+    least_squares, least_squares_sgd, 
+    svd_factor, least_squares_svd,
+)
 from linear_inversion.l1_norm_inversion import l1_norm_inversion, l1_norm_inversion_sgd
 
 
+def _validate(
+    error_type: str, 
+    polynomial_order: int, 
+    use_sgd: bool, 
+    sgd_lr: float, 
+    sgd_iter: int,
+):
+    """
+    Validates the LinearInversion constructor arguments, raising a ValueError
+    for the first invalid argument found.
+    """
+    if int(polynomial_order) != polynomial_order:
+        raise ValueError("polynomial_order must be an integer.")
+    if polynomial_order <= 0:
+        raise ValueError("polynomial_order must be positive.")
+    if use_sgd not in [True, False]:
+        raise ValueError("use_sgd must be boolean.")
+    if sgd_lr <= 0:
+        raise ValueError("sgd_lr must be positive.")
+    if round(sgd_iter) != sgd_iter:
+        raise ValueError("sgd_iter must be an integer.")
+    if sgd_iter <= 0:
+        raise ValueError("sgd_iter must be positive.")
+    if error_type not in ["l1", "l2"]:
+        raise ValueError("error_type must be from the set ['l1', 'l2'].")
+
+
+def _vander(X: np.ndarray, vander_order: int) -> np.ndarray:
+    """
+    Vander matrix of X with columns in decreasing powers, as in np.vander.
+    The straight line and quadratic kernels are stacked directly, and higher
+    orders are filled in a single pass by a JIT kernel if Numba is installed.
+    """
+    ones = np.ones(X.shape[0])
+    if vander_order == 2:
+        return np.stack([X, ones], axis=1)
+    elif vander_order == 3:
+        return np.stack([X * X, X, ones], axis=1)
+    elif NUMBA_AVAILABLE and X.dtype.kind in "biuf":
+        G = np.empty((X.shape[0], vander_order))
+        _fill_vander(np.asarray(X, dtype=np.float64), vander_order, G)
+        return G
+    else:
+        # polyvander orders the columns by increasing power, whereas the model
+        # parameters follow np.vander's decreasing order.
+        return np.ascontiguousarray(polyvander(X, vander_order - 1)[:, ::-1])
+
+
+if NUMBA_AVAILABLE:
+    @njit(fastmath=True, cache=True)
+    def _fill_vander(x, vander_order, out):
+        """
+        JIT compiled vander matrix construction. Fills out row by row with a
+        running product of x, from the constant column on the right.
+        """
+        for i in range(x.shape[0]):
+            v = 1.0
+            for k in range(vander_order - 1, -1, -1):
+                out[i, k] = v
+                v *= x[i]
+
+
 class LinearInversion:
+    __slots__ = (
+        "model", 
+        "m", 
+        "vander_order", 
+        "use_sgd", 
+        "sgd_lr", 
+        "sgd_iter", 
+        "error_type", 
+        "_svd_cache",
+    )
+
+    # Solver for each (error_type, use_sgd) combination.
+    _MODELS = {
+        ("l2", False): least_squares,
+        ("l2", True): least_squares_sgd,
+        ("l1", False): l1_norm_inversion,
+        ("l1", True): l1_norm_inversion_sgd,
+    }
+
     def __init__(
         self, 
         error_type = "l2", 
@@ -45,35 +131,21 @@ class LinearInversion:
             sgd_iter: int
                 SGD iterations. Only works when sgd_iter=True.
         """
-        self.model = None
-        
         self.m = None
-        assert int(polynomial_order) == polynomial_order, "polynomial_order must be an integer."
-        assert polynomial_order > 0, "polynomial_order must be positive."
-        self.vander_order = int(polynomial_order + 1)
 
-        assert use_sgd in [True, False], "use_sgd must be boolean."
-        self.use_sgd = use_sgd
+        # Copy of the X of the last analytical "l2" fit, stored as 
+        # (X, vander_order, factor) where factor is the reduced SVD of the 
+        # data kernel. A repeated fit on equal X with a different y reuses it,
+        # and only needs two matrix vector products.
+        self._svd_cache = None
 
-        assert sgd_lr > 0, "sgd_lr must be positive."
+        _validate(error_type, polynomial_order, use_sgd, sgd_lr, sgd_iter)
+        self.vander_order = int(polynomial_order + 1)
+        self.use_sgd = use_sgd
         self.sgd_lr = sgd_lr
-
-        assert round(sgd_iter) == sgd_iter, "sgd_iter must be an integer."
-        assert sgd_iter > 0, "sgd_iter must be positive."
         self.sgd_iter = sgd_iter
-
-        assert error_type in ["l1", "l2"], "error_type must be from the set ['l1', 'l2']."
         self.error_type = error_type
-        if self.error_type == "l2":
-            if self.use_sgd is True:
-                self.model = least_squares_sgd
-            else:
-                self.model = least_squares
-        elif self.error_type == "l1":
-            if self.use_sgd is True:
-                self.model = l1_norm_inversion_sgd
-            else:
-                self.model = l1_norm_inversion
+        self.model = self._MODELS[(self.error_type, self.use_sgd is True)]
 
 
     def fit(
@@ -118,13 +190,56 @@ class LinearInversion:
             self.m = self.model(G, y, sgd_lr, sgd_iter)
         else:
             if self.error_type == "l2":
-                self.m = self.model(G, y)
+                self.m = self._fit_least_squares(X, G, y, polynomial_order)
             elif self.error_type == "l1":
                 self.m = self.model(G, y, sd)
         
         return self.m
 
 
+    def _fit_least_squares(
+        self, 
+        X: np.ndarray, 
+        G: np.ndarray, 
+        y: np.ndarray, 
+        polynomial_order: int = None,
+    ) -> np.ndarray:
+        """
+        Analytical least squares fit using the reduced SVD of the data kernel,
+        which gives the same solution as least_squares(). The SVD is cached 
+        and reused if the next fit is on the same X values.
+
+        Inputs
+            X: ndarray
+                Data kernel/measurements.
+            G: ndarray
+                Data kernel created from X.
+            y: ndarray
+                Target variables.
+            polynomial_order: int
+                Polynomial order of the linear inversion model.
+        Outputs
+            m: ndarray
+                Model parameters.
+        """
+        if polynomial_order is None:
+            vander_order = self.vander_order
+        else:
+            vander_order = polynomial_order + 1
+
+        # X is compared by value against a private copy, so in place changes
+        # to X between fits invalidate the cache.
+        cached = self._svd_cache
+        if (
+            cached is None 
+            or cached[1] != vander_order 
+            or not np.array_equal(cached[0], X)
+        ):
+            cached = (np.array(X, copy=True), vander_order, svd_factor(G))
+            self._svd_cache = cached
+        return least_squares_svd(cached[2], y)
+
+
     def predict(
         self, 
         X: np.ndarray, 
@@ -144,7 +259,7 @@ class LinearInversion:
         """
         assert self.m is not None
         G = self.make_data_kernel(X, polynomial_order)
-        return np.dot(G, self.m.reshape(-1, 1)).squeeze()
+        return G @ np.ravel(self.m)
 
 
     def make_data_kernel(
@@ -172,7 +287,7 @@ class LinearInversion:
 
         if len(X.shape) == 1:
             if vander_order > 1:
-                return np.vander(X, vander_order)
+                return _vander(X, vander_order)
             else:
                 return X.reshape(-1, 1)
         else:
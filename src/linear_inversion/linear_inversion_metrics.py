@@ -20,4 +20,7 @@ def r2(d: np.ndarray, d_pred: np.ndarray) -> float:
     """
     R**2 (coefficient of determination) regression score function.
     """
-    return 1 - np.sum((d - d_pred)**2) / np.sum((d - np.mean(d))**2)
+    r = d - d_pred
+    s = d - np.mean(d)
+    # np.vdot flattens its inputs, so column vector inputs are also handled.
+    return 1.0 - np.vdot(r, r) / np.vdot(s, s)
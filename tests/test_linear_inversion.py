@@ -13,10 +13,16 @@
 # You should have received a copy of the GNU General Public License along with 
 # linear_inversion. If not, see <https://www.gnu.org/licenses/>.
 
+from functools import lru_cache
 import pytest
 import numpy.testing as npt
 import numpy as np
+from scipy.linalg import LinAlgError
 from linear_inversion import LinearInversion
+from linear_inversion import least_squares as least_squares_module
+from linear_inversion import l1_norm_inversion as l1_norm_inversion_module
+from linear_inversion.jit import NUMBA_AVAILABLE, PARALLEL_THRESHOLD
+from linear_inversion.least_squares import least_squares, svd_inversion
 
 
 @pytest.fixture
@@ -43,15 +49,35 @@ def sgd_l1_config(sgd_l2_config):
     return sgd_l2_config
 
 
+@lru_cache
+def parse_csv(file_path):
+    # Cached so that each test data file is only parsed once per session.
+    return np.loadtxt(file_path, delimiter=",")
+
+
+def load_csv(file_path):
+    # Copied so that a test modifying the data in place does not affect the
+    # cached array used by later tests.
+    return parse_csv(file_path).copy()
+
+
 def load_regression_data(file_path):
-    X = np.genfromtxt(file_path, delimiter=",")
+    X = load_csv(file_path)
     y = X[:, 1]
     X = X[:, 0]
     return X, y
 
 
 def load_regression_model_parameters(file_path):
-    return np.genfromtxt(file_path, delimiter=",")
+    return load_csv(file_path)
+
+
+def svd_inversion_reference(G, d, tol):
+    U, S, Vh = np.linalg.svd(G, full_matrices=True)
+    Sp = S[S >= np.max(S) * tol]
+    p = len(Sp)
+    G_inv = np.dot(Vh[:p, :].T, np.dot(np.linalg.inv(np.diag(Sp)), U[:, :p].T))
+    return np.dot(G_inv, d)
 
 
 @pytest.mark.mlmodel
@@ -67,6 +93,73 @@ class TestL2LinearInversion:
         model.fit(X, y)
         
         npt.assert_allclose(model.m, m, atol=1e-3)
+
+
+    def test_l2_inversion_qr_driver(
+        self, analytical_l2_config, noisy_regression_data, l2_model_parameters,
+    ):
+        X, y = load_regression_data(noisy_regression_data)
+        m = load_regression_model_parameters(l2_model_parameters)
+
+        model = LinearInversion(**analytical_l2_config)
+        G = model.make_data_kernel(X)
+        
+        npt.assert_allclose(least_squares(G, y, lapack_driver="gelsy"), m, atol=1e-3)
+
+
+    def test_l2_inversion_repeated_fit(
+        self, analytical_l2_config, noisy_regression_data, l2_model_parameters,
+    ):
+        X, y = load_regression_data(noisy_regression_data)
+        m = load_regression_model_parameters(l2_model_parameters)
+
+        model = LinearInversion(**analytical_l2_config)
+        G = model.make_data_kernel(X)
+        model.fit(X, 2.0 * y)
+        model.fit(X, y)
+        
+        npt.assert_allclose(model.m, m, atol=1e-3)
+        npt.assert_allclose(model.fit(X, 2.0 * y), least_squares(G, 2.0 * y))
+
+
+    def test_l2_inversion_repeated_fit_in_place_change(self, model_config):
+        X = np.linspace(0.0, 1.0, 10)
+        model = LinearInversion(**model_config)
+        model.fit(X, 2.0 * X + 1.0)
+        model.fit(X, 2.0 * X + 1.0)
+        X *= 3.0
+        
+        npt.assert_allclose(model.fit(X, 2.0 * X + 1.0), [2.0, 1.0], atol=1e-8)
+
+
+    def test_l2_inversion_repeated_fit_ill_conditioned(self, model_config):
+        model_config["polynomial_order"] = 6
+        X = np.linspace(0.0, 1000.0, 60)
+        y = np.sin(X / 100.0)
+        model = LinearInversion(**model_config)
+        G = model.make_data_kernel(X)
+        m_lstsq = least_squares(G, y)
+
+        m_first = model.fit(X, y).copy()
+        m_second = model.fit(X, y)
+        
+        npt.assert_allclose(m_second, m_first, rtol=1e-10)
+        npt.assert_allclose(m_second, m_lstsq, rtol=1e-6)
+        npt.assert_allclose(
+            np.linalg.norm(G @ m_second - y), np.linalg.norm(G @ m_lstsq - y),
+        )
+
+
+    def test_l2_inversion_rank_deficient(self, model_config):
+        X = np.ones(10)
+        y = np.ones(10)
+        model = LinearInversion(**model_config)
+        G = model.make_data_kernel(X)
+        m = model.fit(X, y).copy()
+        
+        npt.assert_allclose(G @ m, y)
+        for _ in range(2):
+            npt.assert_allclose(model.fit(X, y), m)
         
 
     def test_l2_inversion_sgd(
@@ -122,3 +215,112 @@ class TestL2LinearInversion:
         model.m = load_regression_model_parameters(l2_model_parameters)
         
         npt.assert_allclose(y_pred, model.predict(X).squeeze(), atol=1e-3)
+
+
+    @pytest.mark.parametrize("polynomial_order", [1, 2, 3, 5])
+    def test_make_data_kernel(
+        self, model_config, noisy_regression_data, polynomial_order,
+    ):
+        X, _ = load_regression_data(noisy_regression_data)
+
+        model = LinearInversion(**model_config)
+        G = model.make_data_kernel(X, polynomial_order)
+
+        npt.assert_allclose(G, np.vander(X, polynomial_order + 1))
+
+
+    def test_predict_on_view_sharing_data_pointer(self, analytical_l2_config):
+        A = np.arange(20.0)
+        model = LinearInversion(**analytical_l2_config)
+        model.fit(A[:10], A[:10])
+        
+        npt.assert_allclose(model.predict(A[::2]), A[::2], atol=1e-8)
+        npt.assert_allclose(model.predict(A[1::2]), A[1::2], atol=1e-8)
+
+
+
+    def test_predict_column_vector_target(self, analytical_l2_config):
+        X = np.linspace(-1.0, 1.0, 10)
+        y = (X * X - X + 1.0).reshape(-1, 1)
+        model = LinearInversion(**analytical_l2_config)
+        model.fit(X, y)
+        
+        assert model.predict(X).shape == (10,)
+        npt.assert_allclose(model.predict(X), y.squeeze(), atol=1e-8)
+
+        model.set_model_parameters(np.array([[1.0], [-1.0], [1.0]]))
+        npt.assert_allclose(model.predict(X), y.squeeze(), atol=1e-8)
+
+
+    def test_predict_after_in_place_change(self, analytical_l2_config):
+        X = np.linspace(0.0, 1.0, 10)
+        model = LinearInversion(**analytical_l2_config)
+        model.fit(X, X)
+        G = model.make_data_kernel(X)
+        G[:] = 0.0
+        X += 1.0
+        
+        npt.assert_allclose(model.predict(X), X, atol=1e-8)
+
+
+@pytest.mark.mlmodel
+@pytest.mark.skipif(not NUMBA_AVAILABLE, reason="numba is not installed.")
+class TestParallelSGD:
+    @pytest.mark.parametrize(
+        "module, kernel", 
+        [(least_squares_module, "_l2_sgd"), (l1_norm_inversion_module, "_l1_sgd")],
+    )
+    def test_parallel_sgd_kernel(self, module, kernel):
+        rng = np.random.default_rng(0)
+        X = np.linspace(-1.0, 1.0, PARALLEL_THRESHOLD)
+        G = np.vander(X, 3)
+        d = G @ np.array([1.0, -2.0, 0.5]) + 0.1 * rng.normal(size=len(X))
+        m0 = rng.normal(size=3)
+        assert G.size > PARALLEL_THRESHOLD
+
+        losses = np.empty(200)
+        losses_par = np.empty(200)
+        m = getattr(module, kernel)(G, d, 0.1, 200, m0.copy(), losses)
+        m_par = getattr(module, kernel + "_par")(G, d, 0.1, 200, m0.copy(), losses_par)
+        
+        npt.assert_allclose(m_par, m, atol=1e-8)
+        npt.assert_allclose(losses_par, losses, atol=1e-8)
+
+
+@pytest.mark.mlmodel
+class TestSVDInversion:
+    @pytest.mark.parametrize("shape", [(30, 4), (4, 30)])
+    @pytest.mark.parametrize("tol", [0.01, 0.1])
+    def test_svd_inversion(self, shape, tol):
+        rng = np.random.default_rng(0)
+        # Singular values below 0.1 and 0.01 of the largest one are truncated
+        # by the respective tol.
+        U, _ = np.linalg.qr(rng.normal(size=(shape[0], 4)))
+        V, _ = np.linalg.qr(rng.normal(size=(shape[1], 4)))
+        S = np.array([1.0, 0.5, 0.05, 0.001])
+        G = (U * S) @ V.T
+        d = rng.normal(size=shape[0])
+
+        for _ in range(2):
+            npt.assert_allclose(
+                svd_inversion(G, d, tol), 
+                svd_inversion_reference(G, d, tol), 
+                atol=1e-10,
+            )
+
+
+
+    def test_svd_inversion_zero_kernel(self):
+        with pytest.raises(LinAlgError):
+            svd_inversion(np.zeros((10, 3)), np.ones(10))
+
+
+    @pytest.mark.parametrize("solver", [least_squares, svd_inversion])
+    def test_safe_flag_checks_d(self, monkeypatch, solver):
+        monkeypatch.setattr(least_squares_module, "_SAFE", True)
+        G = np.vander(np.linspace(-1.0, 1.0, 11), 3)
+        d = np.ones(11)
+        d[0] = np.nan
+
+        with pytest.raises(ValueError):
+            solver(G, d)
@@ -63,42 +63,42 @@ def sgd_iter_not_positive_config(model_config):
 @pytest.mark.mlmodel
 class TestLinearInversionConfig:
     def test_invalid_error_type_value(self, invalid_error_type_config):
-        with pytest.raises(AssertionError) as excinfo:
+        with pytest.raises(ValueError) as excinfo:
             _ = LinearInversion(**invalid_error_type_config)
         assert "error_type must be from the set ['l1', 'l2']." in str(excinfo.value)
 
 
     def test_polynomial_order_not_int(self, polynomial_order_not_int_config):
-        with pytest.raises(AssertionError) as excinfo:
+        with pytest.raises(ValueError) as excinfo:
             _ = LinearInversion(**polynomial_order_not_int_config)
         assert "polynomial_order must be an integer." in str(excinfo.value)
 
 
     def test_polynomial_order_not_positive(self, polynomial_order_not_positive_config):
-        with pytest.raises(AssertionError) as excinfo:
+        with pytest.raises(ValueError) as excinfo:
             _ = LinearInversion(**polynomial_order_not_positive_config)
         assert "polynomial_order must be positive." in str(excinfo.value)
 
 
     def test_use_sgd_not_boolean(self, use_sgd_not_bool_config):
-        with pytest.raises(AssertionError) as excinfo:
+        with pytest.raises(ValueError) as excinfo:
             _ = LinearInversion(**use_sgd_not_bool_config)
         assert "use_sgd must be boolean." in str(excinfo.value)
 
 
     def test_sgd_lr_not_positive(self, sgd_lr_not_positive_config):
-        with pytest.raises(AssertionError) as excinfo:
+        with pytest.raises(ValueError) as excinfo:
             _ = LinearInversion(**sgd_lr_not_positive_config)
         assert "sgd_lr must be positive." in str(excinfo.value)
 
 
     def test_sgd_iter_not_int(self, sgd_iter_not_int_config):
-        with pytest.raises(AssertionError) as excinfo:
+        with pytest.raises(ValueError) as excinfo:
             _ = LinearInversion(**sgd_iter_not_int_config)
         assert "sgd_iter must be an integer." in str(excinfo.value)
 
 
     def test_sgd_iter_not_positive(self, sgd_iter_not_positive_config):
-        with pytest.raises(AssertionError) as excinfo:
+        with pytest.raises(ValueError) as excinfo:
             _ = LinearInversion(**sgd_iter_not_positive_config)
         assert "sgd_iter must be positive." in str(excinfo.value)
@@ -0,0 +1,38 @@
+# Copyright 2025 Natsunoyuki.
+#
+# linear_inversion is free software: you can redistribute it and/or modify it 
+# under the terms of the GNU General Public License as published by the Free 
+# Software Foundation, either version 3 of the License, or (at your option) any 
+# later version.
+#
+# linear_inversion is distributed in the hope that it will be useful, but 
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or 
+# FITNESS FOR A PARTICULAR PURPOSE. See the GNU General Public License for more 
+# details.
+#
+# You should have received a copy of the GNU General Public License along with 
+# linear_inversion. If not, see <https://www.gnu.org/licenses/>.
+
+import numpy.testing as npt
+import numpy as np
+from linear_inversion.linear_inversion_metrics import r2
+
+
+def r2_reference(d, d_pred):
+    return 1 - np.sum((d - d_pred)**2) / np.sum((d - np.mean(d))**2)
+
+
+class TestLinearInversionMetrics:
+    def test_r2(self):
+        d = np.array([1.0, 2.0, 3.5, 4.0, 6.0])
+        d_pred = np.array([1.1, 1.9, 3.0, 4.2, 5.8])
+
+        npt.assert_allclose(r2(d, d_pred), r2_reference(d, d_pred))
+        npt.assert_allclose(r2(d, d), 1.0)
+
+
+    def test_r2_column_vectors(self):
+        d = np.array([1.0, 2.0, 3.5, 4.0, 6.0]).reshape(-1, 1)
+        d_pred = np.array([1.1, 1.9, 3.0, 4.2, 5.8]).reshape(-1, 1)
+
+        npt.assert_allclose(r2(d, d_pred), r2_reference(d, d_pred))